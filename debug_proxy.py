@@ -5,6 +5,8 @@ Debug proxy usage with YouTube Transcript API
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.proxies import ProxyConfig
@@ -23,15 +25,21 @@ class DebugProxyConfig(ProxyConfig):
         print(f"[DEBUG] to_requests_dict() returning: {result}")
         return result
     
-    @property
-    def prevent_keeping_connections_alive(self):
-        print("[DEBUG] prevent_keeping_connections_alive: True")
-        return True
-    
-    @property
-    def retries_when_blocked(self):
-        print("[DEBUG] retries_when_blocked: 0")
-        return 0
+    # Plain class attributes: the transcript API reads these on every request
+    prevent_keeping_connections_alive = False
+    retries_when_blocked = 0
+
+
+def create_pooled_session() -> requests.Session:
+    """Create a keep-alive session so repeated requests reuse the TLS connection"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount('https://', adapter)
+    return session
 
 
 def test_direct_proxy():
@@ -71,7 +79,10 @@ def test_youtube_api_with_proxy():
     
     try:
         proxy_config = DebugProxyConfig(proxy_url)
-        api = YouTubeTranscriptApi(proxy_config=proxy_config)
+        api = YouTubeTranscriptApi(
+            proxy_config=proxy_config,
+            http_client=create_pooled_session()
+        )
         
         print("[DEBUG] Calling api.list()...")
         transcript_list = api.list(video_id)
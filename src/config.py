@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from .file_utils import read_lines
 
 # Load environment variables
 load_dotenv()
@@ -32,11 +33,17 @@ class Config:
     
     # App Settings
     MAX_VIDEOS = int(os.getenv('MAX_VIDEOS', 20))
-    RETRY_DELAY = int(os.getenv('RETRY_DELAY', 20))  # seconds - delay between video processing to avoid IP blocking
+    RETRY_DELAY = int(os.getenv('RETRY_DELAY', 20))  # seconds - minimum interval between transcript fetches to avoid IP blocking
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))  # number of videos processed concurrently (transcript fetches still spaced by RETRY_DELAY)
+    CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', 8))  # number of concurrent Gen-AI classification requests
+    CLASSIFY_BATCH_SIZE = int(os.getenv('CLASSIFY_BATCH_SIZE', 10))  # videos packed into one classification request
+    OPENAI_RPM = int(os.getenv('OPENAI_RPM', 500))  # client-side OpenAI requests-per-minute budget (0 disables)
+    OPENAI_TPM = int(os.getenv('OPENAI_TPM', 500000))  # client-side OpenAI tokens-per-minute budget (0 disables)
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', 5))  # maximum number of retry attempts for failed requests
     BACKOFF_FACTOR = int(os.getenv('BACKOFF_FACTOR', 3))  # exponential backoff multiplier for retries
     CACHE_DIR = os.path.join(BASE_DIR, '.cache')
     CACHE_EXPIRY_DAYS = 7  # transcript cache expiry in days
+    SUMMARY_CACHE_EXPIRY_DAYS = 30  # summary/classification cache expiry in days
     PROCESSED_VIDEOS_FILE = os.path.join(BASE_DIR, 'processed_videos.txt')
     
     # Video Filtering Constants
@@ -53,18 +60,28 @@ class Config:
 
 
     
+    # get_channel_ids() の結果キャッシュ（reload_channel_ids() で破棄）
+    _channel_ids = None
+
     @classmethod
     def get_channel_ids(cls):
-        channel_ids = []
-        if os.path.exists(cls.CHANNEL_IDS_FILE):
-            with open(cls.CHANNEL_IDS_FILE, 'r', encoding='utf-8') as f:
-                channel_ids = [line.strip() for line in f if line.strip()]
-        
-        if not channel_ids:
-            env_ids = os.getenv('TARGET_CHANNEL_IDS', '').split(',')
-            channel_ids = [cid for cid in env_ids if cid]
-            
-        return channel_ids
+        if cls._channel_ids is not None:
+            # 呼び出し側が変更してもキャッシュに影響しないようコピーを返す
+            return list(cls._channel_ids)
+
+        # ファイルが空・存在しない場合のみ環境変数にフォールバック
+        # （環境変数のみの構成は正規の設定なので、ファイルが無くても警告を出さない）
+        file_ids = read_lines(cls.CHANNEL_IDS_FILE) if os.path.exists(cls.CHANNEL_IDS_FILE) else []
+        channel_ids = file_ids or [
+            cid for cid in os.getenv('TARGET_CHANNEL_IDS', '').split(',') if cid
+        ]
+        cls._channel_ids = tuple(channel_ids)
+        return list(channel_ids)
+
+    @classmethod
+    def reload_channel_ids(cls):
+        cls._channel_ids = None
+        return cls.get_channel_ids()
 
     @classmethod
     def validate(cls):
@@ -8,9 +8,62 @@ from .exceptions import EmailError
 logger = setup_logger(__name__)
 
 class EmailSender:
+    SMTP_HOST = 'smtp.gmail.com'
+    SMTP_PORT = 465
+
     def __init__(self, gmail_user: str, gmail_password: str):
         self.gmail_user = gmail_user
         self.gmail_password = gmail_password
+        self._keep_alive = False
+        self._server: Optional[smtplib.SMTP_SSL] = None
+
+    def __enter__(self) -> 'EmailSender':
+        """
+        Keeps one authenticated SMTP connection open for all sends inside the block.
+
+        Usage:
+            with EmailSender(user, password) as sender:
+                for recipient in recipients:
+                    sender.send_email(recipient, subject, body_text)
+        """
+        self._keep_alive = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._keep_alive = False
+        self.close()
+
+    def _connect(self) -> smtplib.SMTP_SSL:
+        server = smtplib.SMTP_SSL(self.SMTP_HOST, self.SMTP_PORT)
+        server.login(self.gmail_user, self.gmail_password)
+        return server
+
+    def _send(self, msg) -> None:
+        if not self._keep_alive:
+            server = self._connect()
+            server.send_message(msg)
+            server.quit()
+            return
+
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Connection dropped between sends: reconnect once and retry
+            logger.info("SMTP connection closed by server, reconnecting...")
+            self._server = self._connect()
+            self._server.send_message(msg)
+
+    def close(self) -> None:
+        """Closes the persistent SMTP connection if one is open."""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except smtplib.SMTPException:
+            pass
+        self._server = None
 
     def send_email(self, recipient: str, subject: str, body_text: str, body_html: Optional[str] = None):
         """
@@ -25,23 +78,20 @@ class EmailSender:
         Raises:
             EmailError: メール送信に失敗した場合
         """
-        msg = MIMEMultipart('alternative')
+        if body_html:
+            # Plain text + HTML alternatives
+            msg = MIMEMultipart('alternative')
+            msg.attach(MIMEText(body_text, 'plain'))
+            msg.attach(MIMEText(body_html, 'html'))
+        else:
+            # Plain text only: no multipart container needed
+            msg = MIMEText(body_text, 'plain')
         msg['From'] = self.gmail_user
         msg['To'] = recipient
         msg['Subject'] = subject
 
-        # Attach plain text
-        msg.attach(MIMEText(body_text, 'plain'))
-        
-        # Attach HTML if provided
-        if body_html:
-            msg.attach(MIMEText(body_html, 'html'))
-
         try:
-            server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-            server.login(self.gmail_user, self.gmail_password)
-            server.send_message(msg)
-            server.quit()
+            self._send(msg)
             logger.info(f"Email sent successfully to {recipient}")
         except smtplib.SMTPAuthenticationError as e:
             error_msg = f"SMTP authentication failed. Please check your Gmail credentials: {e}"
@@ -1,53 +1,61 @@
-from datetime import datetime
+import html
+from datetime import datetime, timezone
+from functools import lru_cache
 
-def create_youtube_style_html_body(videos):
-    """
-    Generates a responsive HTML email body with a rich YouTube-style design.
-    Enhanced with gradients, shadows, and premium visual elements.
-    Optimized for iPhone/Gmail rendering.
-    """
-    
-    # CSS styles defined inline for email compatibility
-    # Palette: White (#FFFFFF), Red (#FF0000), Black (#0F0F0F), Gray (#606060)
-    
+# CSS declarations per element class
+# Palette: White (#FFFFFF), Red (#FF0000), Black (#0F0F0F), Gray (#606060)
+_STYLES = {
     # Base styles
-    style_body = "font-family: 'Roboto', 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #f9f9f9; margin: 0; padding: 20px; color: #0f0f0f;"
-    style_container = "max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 16px; overflow: hidden; box-shadow: 0 4px 20px rgba(0,0,0,0.05);"
-    
+    'body': "font-family: 'Roboto', 'Helvetica Neue', Helvetica, Arial, sans-serif; background-color: #f9f9f9; margin: 0; padding: 20px; color: #0f0f0f;",
+    'container': "max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 16px; overflow: hidden; box-shadow: 0 4px 20px rgba(0,0,0,0.05);",
+
     # Header
-    style_header = "padding: 16px 24px; border-bottom: 1px solid #f0f0f0; display: flex; align-items: center; justify-content: space-between; background-color: #ffffff;"
-    style_logo_text = "font-family: 'Roboto', sans-serif; font-size: 22px; font-weight: 700; letter-spacing: -0.5px; color: #0f0f0f;"
-    style_date_badge = "background-color: #f2f2f2; padding: 6px 12px; border-radius: 20px; font-size: 12px; font-weight: 500; color: #606060;"
-    
-    style_content_wrapper = "padding: 24px;"
-    
-    # Card
-    style_card = "margin-bottom: 40px; border-bottom: 1px solid #f0f0f0; padding-bottom: 32px;"
-    
+    'header': "padding: 16px 24px; border-bottom: 1px solid #f0f0f0; display: flex; align-items: center; justify-content: space-between; background-color: #ffffff;",
+    'logo_text': "font-family: 'Roboto', sans-serif; font-size: 22px; font-weight: 700; letter-spacing: -0.5px; color: #0f0f0f;",
+    'date_badge': "background-color: #f2f2f2; padding: 6px 12px; border-radius: 20px; font-size: 12px; font-weight: 500; color: #606060;",
+
+    'content_wrapper': "padding: 24px;",
+
+    # Card (the last card has no bottom border/margin)
+    'card': "margin-bottom: 40px; border-bottom: 1px solid #f0f0f0; padding-bottom: 32px;",
+    'card_last': "margin-bottom: 0; border-bottom: none; padding-bottom: 0;",
+
     # Thumbnail
-    style_thumbnail_container = "position: relative; width: 100%; border-radius: 12px; overflow: hidden; margin-bottom: 16px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);"
-    style_thumbnail_img = "width: 100%; display: block; aspect-ratio: 16/9; object-fit: cover;"
-    style_duration_badge = "position: absolute; bottom: 8px; right: 8px; background-color: rgba(0, 0, 0, 0.8); color: #ffffff; padding: 3px 6px; border-radius: 4px; font-size: 12px; font-weight: 500; letter-spacing: 0.5px;"
-    
+    'thumbnail_container': "position: relative; width: 100%; border-radius: 12px; overflow: hidden; margin-bottom: 16px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);",
+    'thumbnail_img': "width: 100%; display: block; aspect-ratio: 16/9; object-fit: cover;",
+    'duration_badge': "position: absolute; bottom: 8px; right: 8px; background-color: rgba(0, 0, 0, 0.8); color: #ffffff; padding: 3px 6px; border-radius: 4px; font-size: 12px; font-weight: 500; letter-spacing: 0.5px;",
+
     # Video Info
-    style_video_info = "padding: 0 4px;"
-    style_video_title = "font-size: 18px; font-weight: 600; line-height: 1.4; color: #0f0f0f; margin-bottom: 12px; text-decoration: none; display: block;"
-    
-    style_meta_text = "font-size: 12px; color: #606060; margin-bottom: 8px;"
-    style_url_link = "font-size: 12px; color: #065fd4; text-decoration: none; display: block; margin-bottom: 16px; word-break: break-all;"
-    
+    'video_info': "padding: 0 4px;",
+    'video_title': "font-size: 18px; font-weight: 600; line-height: 1.4; color: #0f0f0f; margin-bottom: 12px; text-decoration: none; display: block;",
+
+    'meta_text': "font-size: 12px; color: #606060; margin-bottom: 8px;",
+    'url_link': "font-size: 12px; color: #065fd4; text-decoration: none; display: block; margin-bottom: 16px; word-break: break-all;",
+
     # Summary Box
-    style_summary_box = "background-color: #f2f2f2; padding: 16px; border-radius: 12px; margin-bottom: 16px; position: relative;"
-    style_summary_header = "display: flex; align-items: center; margin-bottom: 8px; font-size: 12px; font-weight: 700; color: #0f0f0f;"
-    style_ai_icon = "margin-right: 6px; font-size: 14px;"
-    style_summary_text = "font-size: 14px; line-height: 1.6; color: #0f0f0f;"
-    
+    'summary_box': "background-color: #f2f2f2; padding: 16px; border-radius: 12px; margin-bottom: 16px; position: relative;",
+    'summary_header': "display: flex; align-items: center; margin-bottom: 8px; font-size: 12px; font-weight: 700; color: #0f0f0f;",
+    'ai_icon': "margin-right: 6px; font-size: 14px;",
+    'summary_text': "font-size: 14px; line-height: 1.6; color: #0f0f0f;",
+
     # Action Button
-    style_action_button = "display: inline-block; background-color: #f2f2f2; color: #0f0f0f; padding: 10px 20px; border-radius: 20px; text-decoration: none; font-size: 14px; font-weight: 500;"
-    
-    style_footer = "text-align: center; padding: 32px; background-color: #f9f9f9; color: #909090; font-size: 12px;"
+    'action_button': "display: inline-block; background-color: #f2f2f2; color: #0f0f0f; padding: 10px 20px; border-radius: 20px; text-decoration: none; font-size: 14px; font-weight: 500;",
+
+    'footer': "text-align: center; padding: 32px; background-color: #f9f9f9; color: #909090; font-size: 12px;",
+}
 
-    html = f"""
+# One rule per _STYLES entry (e.g. 'logo_text' -> .logo-text), emitted once in the
+# <style> block instead of repeating inline style= attributes on every element.
+# <body> keeps its inline style as a fallback for clients that drop <style>.
+_CLASS_CSS = '\n'.join(
+    f"            .{name.replace('_', '-')} {{ {declarations} }}"
+    for name, declarations in _STYLES.items()
+    if name != 'body'
+)
+
+# HTML skeleton for the summary email, defined once at import time and filled
+# in with str.format on each render.
+_HEADER_TEMPLATE = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -62,6 +70,9 @@ def create_youtube_style_html_body(videos):
             body, p, h1, h2, h3 {{ margin: 0; padding: 0; }}
             img {{ max-width: 100%; height: auto; }}
             
+            /* Components */
+{class_css}
+            
             /* Mobile Responsive Styles */
             @media only screen and (max-width: 600px) {{
                 body {{ padding: 0 !important; }}
@@ -105,80 +116,148 @@ def create_youtube_style_html_body(videos):
             }}
         </style>
     </head>
-    <body style="{style_body}">
-        <div class="container" style="{style_container}">
+    <body style="{body_style}">
+        <div class="container">
             <!-- Header -->
-            <div class="header" style="{style_header}">
-                <span class="logo-text" style="{style_logo_text}">YouTube Summary</span>
-                <div class="date-badge" style="{style_date_badge}">{datetime.now().strftime('%b %d')}</div>
+            <div class="header">
+                <span class="logo-text">YouTube Summary</span>
+                <div class="date-badge">{date_badge}</div>
             </div>
 
-            <div class="content-wrapper" style="{style_content_wrapper}">
+            <div class="content-wrapper">
     """
-    
-    for idx, video in enumerate(videos, 1):
-        # Format date
-        try:
-            published_at = datetime.fromisoformat(video['published_at'].replace('Z', '+00:00')).strftime('%Y.%m.%d')
-        except:
-            published_at = video['published_at']
-        
-        # Format view count
-        view_count = video['view_count']
-        if view_count >= 1000000:
-            view_str = f"{view_count/1000000:.1f}M views"
-        elif view_count >= 1000:
-            view_str = f"{view_count/1000:.1f}K views"
-        else:
-            view_str = f"{view_count} views"
-        
-        # Last card should not have bottom border/margin
-        current_style_card = style_card
-        if idx == len(videos):
-            current_style_card = "margin-bottom: 0; border-bottom: none; padding-bottom: 0;"
-        
-        html += f"""
+
+_CARD_TEMPLATE = """
                 <!-- Video Card {idx} -->
-                <div class="card" style="{current_style_card}">
-                    <div class="thumbnail-container" style="{style_thumbnail_container}">
-                        <a href="{video['url']}" style="display: block;">
-                            <img src="{video['thumbnail']}" alt="{video['title']}" class="thumbnail-img" style="{style_thumbnail_img}">
-                            <div class="duration-badge" style="{style_duration_badge}">{video['duration']}</div>
+                <div class="{card_class}">
+                    <div class="thumbnail-container">
+                        <a href="{url}" style="display: block;">
+                            <img src="{thumbnail}" alt="{title}" class="thumbnail-img">
+                            <div class="duration-badge">{duration}</div>
                         </a>
                     </div>
                     
-                    <div class="video-info" style="{style_video_info}">
-                        <a href="{video['url']}" class="video-title" style="{style_video_title}">{video['title']}</a>
+                    <div class="video-info">
+                        <a href="{url}" class="video-title">{title}</a>
                         
-                        <div class="meta-text" style="{style_meta_text}">
-                            {video['channel_title']} • {view_str} • {published_at}
+                        <div class="meta-text">
+                            {channel_title} • {view_str} • {published_at}
                         </div>
                         
-                        <a href="{video['url']}" style="{style_url_link}">{video['url']}</a>
+                        <a href="{url}" class="url-link">{url}</a>
 
-                        <div class="summary-box" style="{style_summary_box}">
-                            <div class="summary-header" style="{style_summary_header}">
-                                <span class="ai-icon" style="{style_ai_icon}">✨</span> AI Summary
+                        <div class="summary-box">
+                            <div class="summary-header">
+                                <span class="ai-icon">✨</span> AI Summary
                             </div>
-                            <div class="summary-text" style="{style_summary_text}">
-                                {video['summary'].replace(chr(10), '<br>')}
+                            <div class="summary-text">
+                                {summary}
                             </div>
                         </div>
 
-                        <a href="{video['url']}" class="action-button" style="{style_action_button}">Watch on YouTube</a>
+                        <a href="{url}" class="action-button">Watch on YouTube</a>
                     </div>
                 </div>
         """
-    
-    html += f"""
+
+_FOOTER_TEMPLATE = """
             </div>
             <!-- Footer -->
-            <div class="footer" style="{style_footer}">
-                &copy; {datetime.now().year} YouTube Summary Agent
+            <div class="footer">
+                &copy; {year} YouTube Summary Agent
             </div>
         </div>
     </body>
     </html>
     """
+
+
+def _parse_youtube_timestamp(published_at):
+    """
+    Parses a YouTube publishedAt timestamp.
+    The canonical YYYY-MM-DDTHH:MM:SSZ form is sliced directly; anything else
+    goes through datetime.fromisoformat.
+    """
+    if len(published_at) == 20 and published_at[10] == 'T' and published_at[19] == 'Z':
+        try:
+            return datetime(
+                int(published_at[0:4]), int(published_at[5:7]), int(published_at[8:10]),
+                int(published_at[11:13]), int(published_at[14:16]), int(published_at[17:19]),
+                tzinfo=timezone.utc
+            )
+        except ValueError:
+            pass
+    return datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+
+
+@lru_cache(maxsize=4096)
+def _format_published_at(published_at):
+    """Formats a YouTube publishedAt timestamp as YYYY.MM.DD (raw value on parse failure)."""
+    try:
+        return _parse_youtube_timestamp(published_at).strftime('%Y.%m.%d')
+    except (AttributeError, TypeError, ValueError):
+        return published_at
+
+
+# (threshold, suffix) pairs for abbreviated view counts, largest first
+_VIEW_COUNT_UNITS = ((1_000_000, 'M'), (1_000, 'K'))
+
+
+@lru_cache(maxsize=1024)
+def _format_view_count(view_count):
+    """Formats a view count as e.g. '1.2M views', '3.4K views' or '999 views'."""
+    for threshold, suffix in _VIEW_COUNT_UNITS:
+        if view_count >= threshold:
+            return f"{view_count / threshold:.1f}{suffix} views"
+    return f"{view_count} views"
+
+
+# Video fields interpolated into the card markup as-is apart from HTML escaping
+_ESCAPED_FIELDS = ('url', 'thumbnail', 'title', 'duration', 'channel_title')
+
+
+def _summary_html(summary):
+    """Returns the escaped summary with line breaks as <br>."""
+    return html.escape(summary).replace('\n', '<br>')
+
+
+def create_youtube_style_html_body(videos):
+    """
+    Generates a responsive HTML email body with a rich YouTube-style design.
+    Enhanced with gradients, shadows, and premium visual elements.
+    Optimized for iPhone/Gmail rendering.
+    """
+    # Read the clock once so the header date and footer year always agree
+    now = datetime.now()
+
+    parts = [_HEADER_TEMPLATE.format(
+        class_css=_CLASS_CSS,
+        body_style=_STYLES['body'],
+        date_badge=now.strftime('%b %d')
+    )]
+    
+    for idx, video in enumerate(videos, 1):
+        # Format date
+        published_at = _format_published_at(video['published_at'])
+        
+        # Format view count
+        view_str = _format_view_count(video['view_count'])
+        
+        # Last card should not have bottom border/margin
+        card_class = 'card card-last' if idx == len(videos) else 'card'
+        
+        # Escape API-provided text once; it lands in both attributes and element bodies
+        escaped = {field: html.escape(str(video[field])) for field in _ESCAPED_FIELDS}
+        
+        parts.append(_CARD_TEMPLATE.format(
+            card_class=card_class,
+            idx=idx,
+            view_str=view_str,
+            published_at=html.escape(str(published_at)),
+            summary=_summary_html(video['summary']),
+            **escaped
+        ))
+    
+    parts.append(_FOOTER_TEMPLATE.format(year=now.year))
     
-    return html
+    return ''.join(parts)
@@ -4,36 +4,53 @@
 ファイルの読み書き操作を共通化し、コードの重複を削減します。
 """
 import os
-from typing import List, Set
+import sys
+from typing import List, Optional, Set
 from .logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
-def read_lines(filepath: str, strip: bool = True) -> List[str]:
+def _read_text(filepath: str) -> Optional[str]:
     """
-    ファイルから行を読み込む
+    ファイル全体を1回の read() で読み込む
     
     Args:
         filepath: 読み込むファイルのパス
-        strip: 各行の前後の空白を削除するかどうか
         
     Returns:
-        ファイルの各行のリスト
+        ファイルの内容。存在しない・読み込めない場合はNone
     """
     if not os.path.exists(filepath):
         logger.warning(f"File not found: {filepath}")
-        return []
+        return None
     
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            if strip:
-                return [line.strip() for line in f if line.strip()]
-            else:
-                return [line for line in f]
+            return f.read()
     except Exception as e:
         logger.error(f"Error reading file {filepath}: {e}")
+        return None
+
+
+def read_lines(filepath: str, strip: bool = True) -> List[str]:
+    """
+    ファイルから行を読み込む
+    
+    Args:
+        filepath: 読み込むファイルのパス
+        strip: 各行の前後の空白を削除するかどうか
+        
+    Returns:
+        ファイルの各行のリスト
+    """
+    data = _read_text(filepath)
+    if data is None:
         return []
+    
+    if strip:
+        return [line for line in map(str.strip, data.splitlines()) if line]
+    return data.splitlines(keepends=True)
 
 
 def read_lines_as_set(filepath: str) -> Set[str]:
@@ -46,8 +63,12 @@ def read_lines_as_set(filepath: str) -> Set[str]:
     Returns:
         ファイルの各行のセット（重複なし）
     """
-    lines = read_lines(filepath)
-    return set(lines)
+    data = _read_text(filepath)
+    if data is None:
+        return set()
+    
+    # IDは video_id との照合に使うためインターン化しておく
+    return {sys.intern(line) for line in map(str.strip, data.splitlines()) if line}
 
 
 def append_lines(filepath: str, lines: List[str]) -> None:
@@ -58,11 +79,24 @@ def append_lines(filepath: str, lines: List[str]) -> None:
         filepath: 書き込むファイルのパス
         lines: 追加する行のリスト
     """
+    if not lines:
+        return
+    
+    data = ('\n'.join(lines) + '\n').encode('utf-8')
+    
     try:
-        ensure_file_exists(filepath)
-        with open(filepath, 'a', encoding='utf-8') as f:
-            for line in lines:
-                f.write(f"{line}\n")
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # O_APPEND + O_CREAT で作成と追記を1回のopenで行い、1回のwriteで書き込む
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         logger.debug(f"Appended {len(lines)} lines to {filepath}")
     except Exception as e:
         logger.error(f"Error appending to file {filepath}: {e}")
@@ -76,15 +110,17 @@ def ensure_file_exists(filepath: str) -> None:
     Args:
         filepath: ファイルのパス
     """
-    if not os.path.exists(filepath):
-        # ディレクトリも作成
-        directory = os.path.dirname(filepath)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-        
-        # 空ファイルを作成
-        open(filepath, 'a', encoding='utf-8').close()
+    # ディレクトリも作成
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    # 空ファイルを作成（既存ファイルには触れない）
+    try:
+        open(filepath, 'x', encoding='utf-8').close()
         logger.debug(f"Created file: {filepath}")
+    except FileExistsError:
+        pass
 
 
 def ensure_directory_exists(directory: str) -> None:
@@ -94,6 +130,8 @@ def ensure_directory_exists(directory: str) -> None:
     Args:
         directory: ディレクトリのパス
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory, exist_ok=True)
+    try:
+        os.makedirs(directory)
         logger.debug(f"Created directory: {directory}")
+    except FileExistsError:
+        pass
@@ -1,19 +1,17 @@
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
 
 from .config import Config
 from .logger import setup_logger
-from .youtube_client import YouTubeClient
-from .summarizer import Summarizer
-from .email_sender import EmailSender
 from .email_template import create_youtube_style_html_body
-from .video_processor import VideoProcessor
-from .proxy_manager import ProxyManager
+
+if TYPE_CHECKING:
+    from .email_sender import EmailSender
 
 logger = setup_logger(__name__)
 
 
-def send_notification(email_sender: EmailSender, videos: List[Dict[str, Any]], email_body_text: str):
+def send_notification(email_sender: 'EmailSender', videos: List[Dict[str, Any]], email_body_text: str):
     """
     メール通知を送信
     
@@ -42,6 +40,13 @@ def main():
         logger.error("Missing environment variables or channel IDs. Please check your .env file or channel_ids.txt.")
         sys.exit(1)
 
+    # 重いクライアントライブラリ（googleapiclient, openai 等）は設定検証後に読み込む
+    from .youtube_client import YouTubeClient
+    from .summarizer import Summarizer
+    from .email_sender import EmailSender
+    from .video_processor import VideoProcessor
+    from .proxy_manager import ProxyManager
+
     # プロキシマネージャーの初期化
     proxy_manager = None
     if Config.PROXY_ROTATION_ENABLED:
@@ -68,7 +73,13 @@ def main():
         proxy_manager=proxy_manager,
         user_agent=Config.USER_AGENT
     )
-    summarizer = Summarizer(Config.OPENAI_API_KEY)
+    summarizer = Summarizer(
+        Config.OPENAI_API_KEY,
+        cache_dir=Config.CACHE_DIR,
+        cache_expiry_days=Config.SUMMARY_CACHE_EXPIRY_DAYS,
+        requests_per_minute=Config.OPENAI_RPM,
+        tokens_per_minute=Config.OPENAI_TPM
+    )
     email_sender = EmailSender(Config.GMAIL_USER, Config.GMAIL_APP_PASSWORD)
     
     # VideoProcessorの初期化
@@ -77,7 +88,10 @@ def main():
         summarizer=summarizer,
         processed_videos_file=Config.PROCESSED_VIDEOS_FILE,
         max_videos=Config.MAX_VIDEOS,
-        retry_delay=Config.RETRY_DELAY
+        retry_delay=Config.RETRY_DELAY,
+        max_workers=Config.MAX_WORKERS,
+        classify_workers=Config.CLASSIFY_WORKERS,
+        classify_batch_size=Config.CLASSIFY_BATCH_SIZE
     )
     
     # チャンネルIDを取得
@@ -99,6 +113,7 @@ def main():
     
     # 処理済み動画IDを保存
     video_processor.mark_as_processed([v['video_id'] for v in gen_ai_videos])
+    video_processor.flush()
     logger.info("Done!")
 
 
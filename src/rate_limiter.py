@@ -0,0 +1,78 @@
+"""
+レートリミッター
+
+複数スレッドから呼ばれても、リクエストの開始間隔を一定以上に保ちます。
+スレッドごとの固定sleepの代わりに、全体で共有する間隔制御として使用します。
+TokenBucket はOpenAIのRPM/TPMのような「1分あたりの上限」を事前に守るために使用します。
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """リクエストの開始間隔を制御するスレッドセーフなクラス"""
+
+    def __init__(self, min_interval: float):
+        """
+        Args:
+            min_interval: リクエスト開始の最小間隔（秒）
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> float:
+        """
+        次のリクエスト枠まで待機する
+
+        Returns:
+            実際に待機した時間（秒）
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+
+        # 枠の予約だけをロック内で行い、待機はロック外で行う
+        if wait_time > 0:
+            time.sleep(wait_time)
+            return wait_time
+        return 0.0
+
+
+class TokenBucket:
+    """1分あたりの上限（リクエスト数・トークン数など）を守るスレッドセーフなトークンバケット"""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: 1分あたりに補充される量（バケットの容量も同じ）
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        指定量のトークンが貯まるまで待機して消費する
+
+        Args:
+            amount: 消費する量（容量を超える場合は容量に切り詰める）
+
+        Returns:
+            実際に待機した時間（秒）
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 先に差し引いておき、不足分は待機で補う（後続の呼び出しは順番待ちになる）
+            self._tokens -= amount
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
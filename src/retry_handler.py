@@ -3,13 +3,38 @@
 
 リトライロジックを共通化し、エラー時の再試行処理を統一的に管理します。
 """
+import re
 import time
+import random
 from typing import Callable, Any, Optional
 from .logger import setup_logger
 from .exceptions import RateLimitError, IPBlockingError
 
 logger = setup_logger(__name__)
 
+# エラーメッセージからHTTP 429を検出するパターン
+_RATE_LIMIT_RE = re.compile(r'429|too many requests', re.IGNORECASE)
+
+# 指数バックオフ1回あたりの待機時間の上限（秒）
+MAX_BACKOFF_WAIT_TIME = 60
+
+
+def jittered_backoff(backoff: float) -> float:
+    """
+    指数バックオフの待機時間にジッターを加える（Equal Jitter）
+
+    上限で丸めたうえで [backoff/2, backoff] の範囲に散らすため、
+    元のスケジュールより長く待つことはない。
+
+    Args:
+        backoff: ジッターを加える前の待機時間（秒）
+
+    Returns:
+        待機時間（秒）
+    """
+    backoff = min(backoff, MAX_BACKOFF_WAIT_TIME)
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
 
 class RetryHandler:
     """リトライ処理を管理するクラス"""
@@ -26,6 +51,10 @@ class RetryHandler:
         """
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
+        # 試行回数ごとの待機時間を事前に計算しておく
+        self._backoff = tuple(
+            self.DEFAULT_WAIT_TIME * (backoff_factor ** i) for i in range(max_retries)
+        )
     
     def execute_with_retry(
         self,
@@ -78,7 +107,7 @@ class RetryHandler:
                 
                 logger.warning(
                     f"Attempt {attempt + 1}/{self.max_retries} failed: {type(e).__name__} - {str(e)}. "
-                    f"Retrying in {wait_time} seconds..."
+                    f"Retrying in {wait_time:.1f} seconds..."
                 )
                 
                 time.sleep(wait_time)
@@ -87,7 +116,7 @@ class RetryHandler:
         if last_exception:
             raise last_exception
     
-    def _calculate_wait_time(self, attempt: int, error: Exception) -> int:
+    def _calculate_wait_time(self, attempt: int, error: Exception) -> float:
         """
         待機時間を計算する
         
@@ -104,14 +133,13 @@ class RetryHandler:
                 return error.retry_after
             return self.RATE_LIMIT_WAIT_TIME
         
-        # HTTP 429エラーを文字列から検出
-        error_msg = str(error).lower()
-        if '429' in error_msg or 'too many requests' in error_msg:
-            return self.RATE_LIMIT_WAIT_TIME
-        
         # IP制限エラーの場合はリトライしない（呼び出し側で処理）
         if isinstance(error, IPBlockingError):
             return 0
         
-        # 指数バックオフ
-        return self.DEFAULT_WAIT_TIME * (self.backoff_factor ** attempt)
+        # HTTP 429エラーを文字列から検出
+        if _RATE_LIMIT_RE.search(str(error)):
+            return self.RATE_LIMIT_WAIT_TIME
+        
+        # ジッター付き指数バックオフ（複数ワーカーが同時に再試行しないようにばらつかせる）
+        return jittered_backoff(self._backoff[attempt])
@@ -1,11 +1,200 @@
-from openai import OpenAI
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from .logger import setup_logger
+from .summary_cache import SummaryCache
+from .rate_limiter import TokenBucket
 
 logger = setup_logger(__name__)
 
+MODEL = "gpt-5.1"
+
+# Per-request timeout (seconds). The SDK default of 10 minutes would let one
+# stuck request hold a worker thread for most of the run.
+REQUEST_TIMEOUT = 120.0
+# Retries are left to the SDK, which honours Retry-After on 429/5xx
+MAX_RETRIES = 2
+
+SUMMARY_SYSTEM_PROMPT = """あなたは優秀な要約アシスタントです。
+提供されたYouTube動画の字幕テキストを元に、日本語の要約を作成してください。
+
+【要約の要件】
+- 動画の要点を1000文字程度の文章でまとめてください。
+- 読みやすさを重視し、意味の区切りで適宜改行を入れて、複数の段落に分けて構成してください。
+- 箇条書きは使用せず、自然な文章で記述してください。
+"""
+
+CLASSIFY_SYSTEM_PROMPT = """You are a strict technology content classifier.
+Determine if the following video is related to the specific target topics below. Respond with 'YES' or 'NO'.
+
+TARGET TOPICS (YES):
+- Generative AI (LLM, Image Generation, AI Agents, etc.)
+- Machine Learning / Deep Learning
+- Robotics (Hardware, Software, Humanoids, etc.)
+- Autonomous Driving / Self-driving technology
+- Quantum Computing
+- Semiconductors / AI Chips (NVIDIA, GPU, TPU, manufacturing, etc.)
+
+EXCLUSION CRITERIA (NO):
+- General consumer electronics reviews (Smartphones, PCs, Cameras) unless heavily focused on AI/Chips.
+- General programming/web dev tutorials (HTML, CSS, basic Python) unless AI/ML related.
+- General business/economy/politics unless focused on the target tech sectors.
+- Entertainment/Gaming.
+"""
+
+# Titles that are unambiguously on-topic skip the LLM classifier. Bare "AI" and
+# names that double as other things (NVIDIA, Copilot, Gemini, Claude, Sora, bare
+# GPT) are left to the model, since gaming/PC reviews, music and partition-table
+# videos use them too (see exclusions).
+# ASCII terms use letter lookarounds since \b does not separate them from Japanese.
+GEN_AI_TITLE_RE = re.compile(
+    r"(?<![A-Za-z])(?:ChatGPT|GPT-?\d[\w.]*|LLMs?|OpenAI|Anthropic"
+    r"|Stable Diffusion|Midjourney|Machine Learning|Deep Learning"
+    r"|Robotics|Humanoid Robots?|Quantum Comput(?:er|ers|ing)|Self-Driving|Autonomous Driving)(?![A-Za-z])"
+    r"|生成AI|大規模言語モデル|機械学習|深層学習|ディープラーニング|量子コンピュータ|量子計算|半導体"
+    r"|自動運転|ヒューマノイドロボット|ロボティクス",
+    re.IGNORECASE
+)
+
+# Transcripts longer than this are condensed chunk by chunk (map) before the
+# final summary (reduce); shorter ones go straight to the model
+MAX_TRANSCRIPT_CHARS = 60_000
+CHUNK_CHARS = 20_000
+
+CHUNK_SYSTEM_PROMPT = """あなたは優秀な要約アシスタントです。
+提供されるのはYouTube動画の字幕テキストの一部です。
+後で動画全体の要約を作成するための材料として、この部分の要点を日本語で簡潔に書き出してください。
+"""
+
+# Appended to the classifier prompt when several videos share one request
+CLASSIFY_BATCH_INSTRUCTION = """
+You will receive several numbered videos. Classify each one independently.
+Reply ONLY with a JSON object of the form {"labels": ["YES", "NO", ...]} containing
+exactly one label per video, in the same order as the input.
+"""
+
+# Preferred chunk boundaries: sentence ends, then any whitespace
+_CHUNK_BOUNDARY_RE = re.compile(r"[。．.!?！？]\s*|\s+")
+
+# Caption noise that carries no content: sound annotations and filler words
+_CAPTION_NOISE_RE = re.compile(
+    r"\[(?:音楽|拍手|笑|Music|Applause|Laughter)\]"
+    r"|えーっと|えっと|えーと|(?<![A-Za-z])(?:um+|uh+)(?![A-Za-z])",
+    re.IGNORECASE
+)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _get_client(api_key: str):
+    """
+    Returns the process-wide OpenAI client for an API key, creating it on first use.
+    Every Summarizer (and every worker thread) shares its connection pool.
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(
+                api_key=api_key,
+                timeout=REQUEST_TIMEOUT,
+                max_retries=MAX_RETRIES
+            )
+            _clients[api_key] = client
+        return client
+
 class Summarizer:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, cache_dir: Optional[str] = None, cache_expiry_days: int = 30,
+                 requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self._api_key = api_key
+        # Client-side RPM/TPM budgets (0 disables), so worker threads queue up
+        # instead of bursting into 429s
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._client = None
+        # Results are cached by model + prompt + input, so a prompt edit invalidates them
+        self.cache = SummaryCache(cache_dir, cache_expiry_days) if cache_dir else None
+
+    @property
+    def client(self):
+        """
+        OpenAI client, created on first use.
+
+        Importing openai pulls in httpx and pydantic, so runs that are fully
+        served from cache (or find no new videos) never pay for it.
+        """
+        if self._client is None:
+            self._client = _get_client(self._api_key)
+        return self._client
+
+    def _throttle(self, prompt: str, max_completion_tokens: int) -> None:
+        """
+        Wait until the RPM/TPM budgets allow one more request.
+
+        Tokens are estimated as one per character of prompt plus the completion
+        cap; that is roughly right for Japanese and errs high for English.
+        """
+        waited = 0.0
+        if self._request_bucket:
+            waited += self._request_bucket.acquire()
+        if self._token_bucket:
+            waited += self._token_bucket.acquire(len(prompt) + max_completion_tokens)
+        if waited:
+            logger.debug(f"Throttled OpenAI request for {waited:.1f} seconds")
+
+    @staticmethod
+    def _compress(text: str) -> str:
+        """
+        Deterministically shrink a transcript before sending it to the model.
+
+        Drops caption noise and collapses whitespace. Repeated caption segments
+        are already removed by YouTubeClient.get_transcript before the join.
+        """
+        return " ".join(_CAPTION_NOISE_RE.sub(" ", text).split())
+
+    @staticmethod
+    def _split_chunks(text: str, size: int) -> List[str]:
+        """
+        Splits text into pieces of at most `size` characters, cutting at the last
+        sentence end or space in each window (hard cut if there is none nearby).
+        """
+        chunks = []
+        start = 0
+        while len(text) - start > size:
+            end = start + size
+            cut = end
+            for match in _CHUNK_BOUNDARY_RE.finditer(text, start + size // 2, end):
+                cut = match.end()
+            chunks.append(text[start:cut].strip())
+            start = cut
+        chunks.append(text[start:].strip())
+        return [chunk for chunk in chunks if chunk]
+
+    def _condense(self, text: str) -> str:
+        """
+        Map step for long transcripts: summarizes each chunk concurrently and
+        returns the partial summaries joined in order. Raises on API errors.
+        """
+        chunks = self._split_chunks(text, CHUNK_CHARS)
+        logger.info(f"Transcript is {len(text)} chars; condensing {len(chunks)} chunks first.")
+
+        def summarize_chunk(chunk: str) -> str:
+            self._throttle(CHUNK_SYSTEM_PROMPT + chunk, 1000)
+            response = self.client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+                    {"role": "user", "content": chunk}
+                ],
+                max_completion_tokens=1000,
+                temperature=0.3
+            )
+            return response.choices[0].message.content.strip()
+
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            return "\n\n".join(executor.map(summarize_chunk, chunks))
 
     def summarize(self, text: str) -> str:
         """
@@ -15,67 +204,149 @@ class Summarizer:
             logger.warning("No text provided for summarization.")
             return "要約するテキストがありませんでした。"
 
-        # Truncate text if it's extremely long to avoid token limits (though unlikely with modern models for single videos)
-        # A 1 hour video speaks about 9000-10000 words. GPT-4o-mini has 128k context. We are safe.
+        # Transcripts over MAX_TRANSCRIPT_CHARS are condensed chunk by chunk before the final summary
+        compressed = self._compress(text)
+        logger.debug(f"Compressed transcript from {len(text)} to {len(compressed)} chars")
+        text = compressed or text
         
+        cache_key = None
+        if self.cache:
+            cache_key = SummaryCache.make_key("summary", MODEL, SUMMARY_SYSTEM_PROMPT, text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached summary.")
+                return cached
+
         try:
+            # The cache key stays on the full transcript; only the model input is condensed
+            source = self._condense(text) if len(text) > MAX_TRANSCRIPT_CHARS else text
+            self._throttle(SUMMARY_SYSTEM_PROMPT + source, 2000)
             response = self.client.chat.completions.create(
-                model="gpt-5.1", # Updated to GPT-5.1
+                model=MODEL, # Updated to GPT-5.1
                 messages=[
-                    {"role": "system", "content": """あなたは優秀な要約アシスタントです。
-提供されたYouTube動画の字幕テキストを元に、日本語の要約を作成してください。
-
-【要約の要件】
-- 動画の要点を1000文字程度の文章でまとめてください。
-- 読みやすさを重視し、意味の区切りで適宜改行を入れて、複数の段落に分けて構成してください。
-- 箇条書きは使用せず、自然な文章で記述してください。
-"""},
-                    {"role": "user", "content": text}
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": source}
                 ],
                 max_completion_tokens=2000, # Use max_completion_tokens for GPT-5.1
                 temperature=0.7
             )
-            return response.choices[0].message.content.strip()
+            summary = response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"Error during summarization: {e}")
             return "要約の生成中にエラーが発生しました。"
 
+        if cache_key:
+            self.cache.set(cache_key, summary)
+        return summary
+
     def is_gen_ai_video(self, title: str, description: str) -> bool:
         """
         Determines if a video is related to Generative AI using GPT-5.1.
         """
+        if GEN_AI_TITLE_RE.search(title):
+            logger.debug(f"Keyword match, skipping classifier: {title}")
+            return True
+
+        content = f"Title: {title}\nDescription: {description[:500]}" # Limit description length
+        cache_key = None
+        if self.cache:
+            cache_key = SummaryCache.make_key("classification", MODEL, CLASSIFY_SYSTEM_PROMPT, content)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        self._throttle(CLASSIFY_SYSTEM_PROMPT + content, 50)
         try:
-            content = f"Title: {title}\nDescription: {description[:500]}" # Limit description length
             response = self.client.chat.completions.create(
-                model="gpt-5.1", # Updated to GPT-5.1
+                model=MODEL, # Updated to GPT-5.1
                 messages=[
-                    {"role": "system", "content": """You are a strict technology content classifier.
-Determine if the following video is related to the specific target topics below. Respond with 'YES' or 'NO'.
-
-TARGET TOPICS (YES):
-- Generative AI (LLM, Image Generation, AI Agents, etc.)
-- Machine Learning / Deep Learning
-- Robotics (Hardware, Software, Humanoids, etc.)
-- Autonomous Driving / Self-driving technology
-- Quantum Computing
-- Semiconductors / AI Chips (NVIDIA, GPU, TPU, manufacturing, etc.)
-
-EXCLUSION CRITERIA (NO):
-- General consumer electronics reviews (Smartphones, PCs, Cameras) unless heavily focused on AI/Chips.
-- General programming/web dev tutorials (HTML, CSS, basic Python) unless AI/ML related.
-- General business/economy/politics unless focused on the target tech sectors.
-- Entertainment/Gaming.
-"""},
+                    {"role": "system", "content": CLASSIFY_SYSTEM_PROMPT},
                     {"role": "user", "content": content}
                 ],
                 max_completion_tokens=50, # Increased to avoid token limit error
                 temperature=0.0
             )
             result = response.choices[0].message.content.strip().upper()
-            return "YES" in result
+            is_gen_ai = "YES" in result
         except Exception as e:
             logger.error(f"Error during classification: {e}")
             # Default to False on error to avoid spam, or True to be safe? 
             # Let's default to False to be strict as per user request "only Gen AI".
             return False
 
+        if cache_key:
+            self.cache.set(cache_key, is_gen_ai)
+        return is_gen_ai
+
+    def classify_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        """
+        Classifies several (title, description) pairs, index-aligned with the input.
+
+        Keyword matches and cached results are resolved locally; the rest share a
+        single request so the classifier prompt is paid for once. If the packed
+        response can't be parsed, those items fall back to is_gen_ai_video.
+        """
+        results: List[Optional[bool]] = [None] * len(items)
+        pending = []  # (index, content, cache_key)
+
+        for i, (title, description) in enumerate(items):
+            if GEN_AI_TITLE_RE.search(title):
+                results[i] = True
+                continue
+            content = f"Title: {title}\nDescription: {description[:500]}" # Limit description length
+            cache_key = None
+            if self.cache:
+                cache_key = SummaryCache.make_key("classification", MODEL, CLASSIFY_SYSTEM_PROMPT, content)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending.append((i, content, cache_key))
+
+        if len(pending) == 1:
+            i, _, _ = pending[0]
+            results[i] = self.is_gen_ai_video(*items[i])
+        elif pending:
+            labels = self._classify_packed([content for _, content, _ in pending])
+            for n, (i, _, cache_key) in enumerate(pending):
+                if labels is None:
+                    results[i] = self.is_gen_ai_video(*items[i])
+                    continue
+                results[i] = labels[n]
+                if cache_key:
+                    self.cache.set(cache_key, labels[n])
+
+        return results
+
+    def _classify_packed(self, contents: List[str]) -> Optional[List[bool]]:
+        """
+        Sends several classification inputs in one request.
+
+        Returns:
+            One bool per input, or None if the request failed or the reply was malformed
+        """
+        system_prompt = CLASSIFY_SYSTEM_PROMPT + CLASSIFY_BATCH_INSTRUCTION
+        user_content = "\n\n".join(f"{n}. {content}" for n, content in enumerate(contents, 1))
+        max_tokens = 50 + 10 * len(contents)
+
+        self._throttle(system_prompt + user_content, max_tokens)
+        try:
+            response = self.client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                max_completion_tokens=max_tokens,
+                temperature=0.0,
+                response_format={"type": "json_object"}
+            )
+            labels = json.loads(response.choices[0].message.content)["labels"]
+        except Exception as e:
+            logger.warning(f"Batched classification failed, falling back to per-video requests: {e}")
+            return None
+
+        if not isinstance(labels, list) or len(labels) != len(contents):
+            logger.warning(f"Batched classification returned {labels!r} for {len(contents)} videos; falling back")
+            return None
+        return ["YES" in str(label).upper() for label in labels]
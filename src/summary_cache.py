@@ -0,0 +1,102 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Optional
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class SummaryCache:
+    """
+    SQLite-backed cache for OpenAI results (summaries and Gen-AI classifications)
+    so re-runs do not pay for the same completion twice.
+    """
+
+    def __init__(self, cache_dir: str, expiry_days: int = 30):
+        """
+        Initialize the summary cache.
+
+        Args:
+            cache_dir: Directory to store the cache database
+            expiry_days: Number of days before cache entries expire
+        """
+        self.cache_dir = cache_dir
+        self.expiry_days = expiry_days
+        self.cache_file = os.path.join(cache_dir, 'llm_cache.sqlite')
+        # Summaries and classifications run on worker threads; they share one
+        # connection, serialized by the lock
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL)'
+            )
+        logger.info(f"Opened summary cache at {self.cache_file}")
+        self.cleanup()
+
+    @staticmethod
+    def make_key(namespace: str, *parts: str) -> str:
+        """
+        Build a content-addressed cache key.
+
+        Args:
+            namespace: Kind of result ('summary' or 'classification')
+            *parts: Everything that influences the result (model, prompt, input)
+
+        Returns:
+            Key of the form '<namespace>:<hex digest>'
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x1f')
+        return f"{namespace}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached result if it exists and hasn't expired.
+
+        Args:
+            key: Key built with make_key()
+
+        Returns:
+            Cached value or None if not found or expired
+        """
+        cutoff = time.time() - self.expiry_days * 86400
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM llm_cache WHERE key = ? AND ts > ?', (key, cutoff)
+            ).fetchone()
+        if row is None:
+            return None
+
+        logger.debug(f"Summary cache hit for {key}")
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        """
+        Store a result in cache.
+
+        Args:
+            key: Key built with make_key()
+            value: JSON-serializable result
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, ts) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+
+    def cleanup(self):
+        """Remove expired entries from cache."""
+        cutoff = time.time() - self.expiry_days * 86400
+        with self._lock, self._conn:
+            removed = self._conn.execute('DELETE FROM llm_cache WHERE ts <= ?', (cutoff,)).rowcount
+        if removed:
+            logger.info(f"Cleaned up {removed} expired summary cache entries")
@@ -1,7 +1,9 @@
 import os
 import json
 import time
-from datetime import datetime, timedelta
+import sqlite3
+import threading
+from datetime import datetime
 from typing import Optional
 from .logger import setup_logger
 
@@ -9,137 +11,142 @@ logger = setup_logger(__name__)
 
 class TranscriptCache:
     """
-    File-based cache for YouTube transcripts to reduce API requests and avoid IP restrictions.
+    SQLite-backed cache for YouTube transcripts to reduce API requests and avoid IP restrictions.
     """
-    
+
     def __init__(self, cache_dir: str, expiry_days: int = 7):
         """
         Initialize the transcript cache.
-        
+
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Directory to store the cache database
             expiry_days: Number of days before cache entries expire
         """
         self.cache_dir = cache_dir
         self.expiry_days = expiry_days
-        self.cache_file = os.path.join(cache_dir, 'transcripts.json')
-        
+        self.cache_file = os.path.join(cache_dir, 'transcripts.sqlite')
+        # Transcripts are fetched from worker threads; they share one connection,
+        # serialized by the lock
+        self._lock = threading.Lock()
+
         # Create cache directory if it doesn't exist
         os.makedirs(cache_dir, exist_ok=True)
-        
-        # Load existing cache or create new one
-        self._load_cache()
-    
-    def _load_cache(self):
-        """Load cache from file or create empty cache."""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                logger.info(f"Loaded transcript cache with {len(self.cache)} entries")
-            except Exception as e:
-                logger.warning(f"Failed to load cache file: {e}. Creating new cache.")
-                self.cache = {}
-        else:
-            self.cache = {}
-            logger.info("Created new transcript cache")
-    
-    def _save_cache(self):
-        """Save cache to file."""
+
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS transcripts (video_id TEXT PRIMARY KEY, text TEXT NOT NULL, ts REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS transcripts_ts ON transcripts (ts)')
+        self._import_legacy_json()
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+        logger.info(f"Loaded transcript cache with {count} entries")
+        self.cleanup()
+
+    def _import_legacy_json(self):
+        """
+        One-shot migration from the old transcripts.json cache.
+
+        ISO timestamps are converted to epoch floats once here, so lookups never
+        parse dates. The JSON file is renamed afterwards so this only runs once.
+        """
+        legacy_file = os.path.join(self.cache_dir, 'transcripts.json')
+        if not os.path.exists(legacy_file):
+            return
+
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-            logger.debug(f"Saved transcript cache with {len(self.cache)} entries")
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            rows = [
+                (video_id, entry['transcript'], datetime.fromisoformat(entry['timestamp']).timestamp())
+                for video_id, entry in legacy.items()
+            ]
+            with self._lock, self._conn:
+                # Entries already in SQLite are newer than anything in the old file
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO transcripts (video_id, text, ts) VALUES (?, ?, ?)', rows
+                )
+            os.replace(legacy_file, legacy_file + '.migrated')
+            logger.info(f"Migrated {len(rows)} entries from {legacy_file}")
         except Exception as e:
-            logger.error(f"Failed to save cache file: {e}")
-    
+            logger.warning(f"Failed to migrate legacy cache file {legacy_file}: {e}")
+
+    def _cutoff(self) -> float:
+        """Entries written at or before this epoch time have expired."""
+        return time.time() - self.expiry_days * 86400
+
     def get(self, video_id: str) -> Optional[str]:
         """
         Get transcript from cache if it exists and hasn't expired.
-        
+
         Args:
             video_id: YouTube video ID
-            
+
         Returns:
             Cached transcript text or None if not found or expired
         """
-        if video_id not in self.cache:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text FROM transcripts WHERE video_id = ? AND ts > ?',
+                (video_id, self._cutoff())
+            ).fetchone()
+
+        if row is None:
             logger.debug(f"Cache miss for video {video_id}")
             return None
-        
-        entry = self.cache[video_id]
-        cached_time = datetime.fromisoformat(entry['timestamp'])
-        expiry_time = cached_time + timedelta(days=self.expiry_days)
-        
-        if datetime.now() > expiry_time:
-            logger.info(f"Cache expired for video {video_id}")
-            del self.cache[video_id]
-            self._save_cache()
-            return None
-        
+
         logger.info(f"Cache hit for video {video_id}")
-        return entry['transcript']
-    
+        return row[0]
+
     def set(self, video_id: str, transcript: str):
         """
         Store transcript in cache.
-        
+
         Args:
             video_id: YouTube video ID
             transcript: Transcript text to cache
         """
-        self.cache[video_id] = {
-            'transcript': transcript,
-            'timestamp': datetime.now().isoformat()
-        }
-        self._save_cache()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO transcripts (video_id, text, ts) VALUES (?, ?, ?)',
+                (video_id, transcript, time.time())
+            )
         logger.info(f"Cached transcript for video {video_id}")
-    
+
     def cleanup(self):
         """Remove expired entries from cache."""
-        now = datetime.now()
-        expired_keys = []
-        
-        for video_id, entry in self.cache.items():
-            cached_time = datetime.fromisoformat(entry['timestamp'])
-            expiry_time = cached_time + timedelta(days=self.expiry_days)
-            
-            if now > expiry_time:
-                expired_keys.append(video_id)
-        
-        for key in expired_keys:
-            del self.cache[key]
-        
-        if expired_keys:
-            self._save_cache()
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
-    
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                'DELETE FROM transcripts WHERE ts <= ?', (self._cutoff(),)
+            ).rowcount
+
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
+
     def clear(self):
         """Clear all cache entries."""
-        self.cache = {}
-        self._save_cache()
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM transcripts')
         logger.info("Cleared all cache entries")
-    
+
     def stats(self) -> dict:
         """
         Get cache statistics.
-        
+
         Returns:
             Dictionary with cache statistics
         """
-        total_entries = len(self.cache)
-        now = datetime.now()
-        expired_count = 0
-        
-        for entry in self.cache.values():
-            cached_time = datetime.fromisoformat(entry['timestamp'])
-            expiry_time = cached_time + timedelta(days=self.expiry_days)
-            if now > expiry_time:
-                expired_count += 1
-        
+        with self._lock:
+            total_entries, valid_entries = self._conn.execute(
+                'SELECT COUNT(*), COUNT(CASE WHEN ts > ? THEN 1 END) FROM transcripts',
+                (self._cutoff(),)
+            ).fetchone()
+
         return {
             'total_entries': total_entries,
-            'valid_entries': total_entries - expired_count,
-            'expired_entries': expired_count,
+            'valid_entries': valid_entries,
+            'expired_entries': total_entries - valid_entries,
             'cache_file': self.cache_file
         }
@@ -4,15 +4,19 @@
 動画の取得、フィルタリング、処理を担当するクラスです。
 main.pyのビジネスロジックをここに集約します。
 """
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Set
 from .logger import setup_logger
 from .youtube_client import YouTubeClient
 from .summarizer import Summarizer
 from .file_utils import read_lines_as_set, append_lines
+from .rate_limiter import RateLimiter
 
 logger = setup_logger(__name__)
 
+# プレーンテキスト本文で各動画の間に入れる区切り線
+SEP = "-" * 30 + "\n\n"
+
 
 class VideoProcessor:
     """動画の取得、フィルタリング、処理を担当するクラス"""
@@ -23,7 +27,10 @@ class VideoProcessor:
         summarizer: Summarizer,
         processed_videos_file: str,
         max_videos: int,
-        retry_delay: int
+        retry_delay: int,
+        max_workers: int = 4,
+        classify_workers: int = 8,
+        classify_batch_size: int = 10
     ):
         """
         Args:
@@ -31,14 +38,22 @@ class VideoProcessor:
             summarizer: 要約生成クラス
             processed_videos_file: 処理済み動画IDを保存するファイルパス
             max_videos: 1回の実行で処理する最大動画数
-            retry_delay: 動画処理間の遅延時間（秒）
+            retry_delay: 字幕取得の開始間隔（秒）
+            max_workers: 並行して処理する動画数
+            classify_workers: 生成AI判定を並行して実行する数
+            classify_batch_size: 1回のリクエストでまとめて判定する動画数
         """
         self.youtube_client = youtube_client
         self.summarizer = summarizer
         self.processed_videos_file = processed_videos_file
         self.max_videos = max_videos
         self.retry_delay = retry_delay
+        self.max_workers = max_workers
+        self.classify_workers = classify_workers
+        self.classify_batch_size = classify_batch_size
         self.processed_ids = self._load_processed_videos()
+        # mark_as_processed で溜めたIDは flush() でまとめて1回だけ書き込む
+        self._pending: List[str] = []
     
     def _load_processed_videos(self) -> Set[str]:
         """処理済み動画IDを読み込む"""
@@ -107,10 +122,16 @@ class VideoProcessor:
         Returns:
             生成AI関連の動画リスト
         """
-        gen_ai_videos = []
+        # 複数の動画を1リクエストにまとめ、さらにバッチ同士を並行して判定する
+        size = self.classify_batch_size
+        batches = [videos[i:i + size] for i in range(0, len(videos), size)]
+        with ThreadPoolExecutor(max_workers=self.classify_workers) as executor:
+            flags = [flag for batch_flags in executor.map(self._classify_batch, batches) for flag in batch_flags]
         
-        for video in videos:
-            if self._is_gen_ai_content(video):
+        # ログの順序を一定に保つため、元の順序で結果を確認する
+        gen_ai_videos = []
+        for video, is_gen_ai in zip(videos, flags):
+            if is_gen_ai:
                 gen_ai_videos.append(video)
                 logger.info(f"  [KEEP] {video['title']}")
             else:
@@ -122,19 +143,18 @@ class VideoProcessor:
         
         return gen_ai_videos
     
-    def _is_gen_ai_content(self, video: Dict[str, Any]) -> bool:
+    def _classify_batch(self, videos: List[Dict[str, Any]]) -> List[bool]:
         """
-        動画が生成AI関連かどうかを判定
+        動画のまとまりが生成AI関連かどうかを判定
         
         Args:
-            video: 動画情報
+            videos: 動画情報のリスト
             
         Returns:
-            生成AI関連ならTrue
+            各動画について生成AI関連ならTrue（入力と同じ順序）
         """
-        return self.summarizer.is_gen_ai_video(
-            video['title'],
-            video.get('description', '')
+        return self.summarizer.classify_batch(
+            [(video['title'], video.get('description', '')) for video in videos]
         )
     
     def process_videos(self, videos: List[Dict[str, Any]]) -> str:
@@ -148,45 +168,79 @@ class VideoProcessor:
             プレーンテキストのメール本文
         """
         logger.info(f"Processing {len(videos)} videos...")
-        email_body_text = "直近の更新動画要約です。\n\n"
         
-        for idx, video in enumerate(videos, 1):
-            logger.info(f"[{idx}/{len(videos)}] Processing: {video['title']} ({video['url']})")
+        # IP制限を回避するため、字幕取得の開始間隔は全スレッド共通で retry_delay 秒空ける。
+        # 要約生成（OpenAI）は次の動画の字幕取得と並行して進む。
+        limiter = RateLimiter(self.retry_delay)
+        total = len(videos)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._summarize_video, video, idx, total, limiter)
+                for idx, video in enumerate(videos, 1)
+            ]
+            summaries = [future.result() for future in futures]
+        
+        # 元の順序でプレーンテキスト本文を構築
+        parts = ["直近の更新動画要約です。\n\n"]
+        for video, summary in zip(videos, summaries):
+            video['summary'] = summary
             
-            # IP制限を回避するため、各リクエストの間に遅延を追加
-            if idx > 1:
-                logger.info(f"  Waiting {self.retry_delay} seconds to avoid IP blocking...")
-                time.sleep(self.retry_delay)
+            parts.append(f"■ {video['title']}\n")
+            parts.append(f"URL: {video['url']}\n")
+            parts.append(f"要約:\n{summary}\n")
+            parts.append(SEP)
+        
+        return "".join(parts)
+    
+    def _summarize_video(self, video: Dict[str, Any], idx: int, total: int, limiter: RateLimiter) -> str:
+        """
+        1本の動画の字幕を取得し、要約を生成する（ワーカースレッドで実行）
+        
+        Args:
+            video: 動画情報
+            idx: 動画の通し番号（1から始まる）
+            total: 動画の総数
+            limiter: 字幕取得の開始間隔を制御するリミッター（再試行も含め毎回枠を取る）
             
+        Returns:
+            要約テキスト
+        """
+        logger.info(f"[{idx}/{total}] Processing: {video['title']} ({video['url']})")
+        
+        # 1本の失敗で完了済みの要約まで失わないよう、例外はここで動画ごとに処理する
+        try:
             # 字幕を取得
-            transcript = self.youtube_client.get_transcript(video['video_id'])
+            transcript = self.youtube_client.get_transcript(video['video_id'], limiter)
             
             # 要約を生成
             if transcript:
-                logger.info("  Transcript found. Summarizing...")
-                summary = self.summarizer.summarize(transcript)
-            else:
-                logger.warning("  No transcript found.")
-                summary = "字幕が取得できなかったため、要約を作成できませんでした。"
-            
-            video['summary'] = summary
-            
-            # プレーンテキスト本文を構築
-            email_body_text += f"■ {video['title']}\n"
-            email_body_text += f"URL: {video['url']}\n"
-            email_body_text += f"要約:\n{summary}\n"
-            email_body_text += "-" * 30 + "\n\n"
-        
-        return email_body_text
+                logger.info(f"[{idx}/{total}] Transcript found. Summarizing...")
+                return self.summarizer.summarize(transcript)
+        except Exception as e:
+            logger.error(f"[{idx}/{total}] Failed to process {video['video_id']}: {e}")
+            return "要約の生成中にエラーが発生しました。"
+        
+        logger.warning(f"[{idx}/{total}] No transcript found.")
+        return "字幕が取得できなかったため、要約を作成できませんでした。"
     
     def mark_as_processed(self, video_ids: List[str]) -> None:
         """
-        動画を処理済みとしてマーク
+        動画を処理済みとしてマーク（ファイルへの書き込みは flush() で行う）
         
         Args:
             video_ids: 処理済みとしてマークする動画IDのリスト
         """
-        append_lines(self.processed_videos_file, video_ids)
+        self._pending.extend(video_ids)
         # メモリ上のセットも更新
         self.processed_ids.update(video_ids)
         logger.info(f"Marked {len(video_ids)} videos as processed.")
+    
+    def flush(self) -> None:
+        """未書き込みの処理済み動画IDを1回の追記でファイルに保存する"""
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, []
+        append_lines(self.processed_videos_file, pending)
+        logger.info(f"Saved {len(pending)} processed video IDs.")
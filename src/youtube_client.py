@@ -1,13 +1,21 @@
 import os
+import re
+import sys
 import time
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Tuple, Any
+from xml.etree import ElementTree
 from googleapiclient.discovery import build
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 from youtube_transcript_api.proxies import ProxyConfig
 from .logger import setup_logger
 from .transcript_cache import TranscriptCache
+from .rate_limiter import RateLimiter
 from .exceptions import IPBlockingError, RateLimitError, TranscriptError
+from .retry_handler import jittered_backoff
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -47,6 +55,17 @@ class RotatingProxyConfig(ProxyConfig):
 
 logger = setup_logger(__name__)
 
+# Per-channel uploads feed; costs no Data API quota
+FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+_FEED_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+    'media': 'http://search.yahoo.com/mrss/',
+}
+
+# ISO 8601 duration as returned by videos.list (e.g. PT1H2M10S)
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
 
 class YouTubeClient:
     def __init__(self, api_key: str, cookies_file: Optional[str] = None, 
@@ -54,7 +73,10 @@ class YouTubeClient:
                  max_retries: int = 3, backoff_factor: int = 2,
                  proxy_manager: Optional['ProxyManager'] = None,
                  user_agent: Optional[str] = None):
+        self.api_key = api_key
         self.youtube = build('youtube', 'v3', developerKey=api_key)
+        # googleapiclient services are not thread-safe; worker threads build their own
+        self._thread_local = threading.local()
         self.cookies_file = cookies_file
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
@@ -81,19 +103,18 @@ class YouTubeClient:
         else:
             logger.info("Using default User-Agent")
 
-    def _parse_duration(self, duration_iso: str) -> Tuple[str, int]:
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _parse_duration(duration_iso: str) -> Tuple[str, int]:
         """
         Parses ISO 8601 duration (e.g., PT1H2M10S) to a readable string (e.g., 1:02:10).
         Returns a tuple: (formatted_string, total_seconds)
         """
-        import re
-        match = re.match(r'PT(\d+H)?(\d+M)?(\d+S)?', duration_iso)
+        match = _DURATION_RE.match(duration_iso)
         if not match:
             return "00:00", 0
         
-        hours = int(match.group(1)[:-1]) if match.group(1) else 0
-        minutes = int(match.group(2)[:-1]) if match.group(2) else 0
-        seconds = int(match.group(3)[:-1]) if match.group(3) else 0
+        hours, minutes, seconds = (int(value) if value else 0 for value in match.groups())
         
         total_seconds = hours * 3600 + minutes * 60 + seconds
         
@@ -104,6 +125,19 @@ class YouTubeClient:
         
         return formatted, total_seconds
 
+    # channels.list / videos.list accept at most 50 comma-separated IDs per call
+    MAX_IDS_PER_REQUEST = 50
+    # Upper bound on concurrent playlistItems.list calls
+    MAX_CHANNEL_WORKERS = 8
+
+    def _thread_service(self):
+        """Returns a YouTube API service object owned by the calling thread."""
+        service = getattr(self._thread_local, 'youtube', None)
+        if service is None:
+            service = build('youtube', 'v3', developerKey=self.api_key)
+            self._thread_local.youtube = service
+        return service
+
     def get_videos_from_channels(self, channel_ids: List[str]) -> List[Dict[str, Any]]:
         """
         Fetches videos uploaded in the last N days from the specified channels.
@@ -114,70 +148,176 @@ class YouTubeClient:
         # N days ago in RFC 3339 format
         published_after = (datetime.now(timezone.utc) - timedelta(days=Config.DAYS_TO_FETCH)).isoformat()
 
-        for channel_id in channel_ids:
+        # Pass 1: recent uploads from each channel's RSS feed (no API quota),
+        # fetched concurrently; None marks channels whose feed could not be read
+        with ThreadPoolExecutor(max_workers=min(self.MAX_CHANNEL_WORKERS, len(channel_ids) or 1)) as executor:
+            feeds = list(executor.map(
+                lambda channel_id: self._get_recent_uploads_from_feed(channel_id, published_after), channel_ids
+            ))
+
+            # Pass 2: fall back to channels.list + playlistItems.list for those channels
+            failed = [channel_id for channel_id, feed in zip(channel_ids, feeds) if feed is None]
+            fallback = {}
+            if failed:
+                logger.info(f"Falling back to the Data API for {len(failed)} channels")
+                uploads_playlists = self._get_uploads_playlists(failed)
+                playlists = [(channel_id, uploads_playlists[channel_id])
+                             for channel_id in failed if channel_id in uploads_playlists]
+                fallback = dict(zip(
+                    [channel_id for channel_id, _ in playlists],
+                    executor.map(lambda playlist: self._get_recent_uploads(*playlist, published_after), playlists)
+                ))
+
+        # Flatten in channel order
+        snippets = []
+        for channel_id, feed in zip(channel_ids, feeds):
+            snippets.extend(feed if feed is not None else fallback.get(channel_id, []))
+
+        # Pass 3: duration and view count for every candidate, 50 videos per request
+        details_by_id = self._get_video_details([snippet['resourceId']['videoId'] for snippet in snippets])
+
+        parse_duration = self._parse_duration
+        min_duration = Config.MIN_VIDEO_DURATION_SECONDS
+        for snippet in snippets:
+            video_id = sys.intern(snippet['resourceId']['videoId'])
+            details = details_by_id.get(video_id)
+            if details is None:
+                continue
+            
+            duration, duration_seconds = parse_duration(details['contentDetails']['duration'])
+            title = snippet['title']
+            
+            # 短い動画を除外
+            if duration_seconds <= min_duration:
+                logger.info(f"Skipping short video (duration: {duration}): {title}")
+                continue
+            
+            view_count = details['statistics'].get('viewCount', '0')
+            # Only fall back to 'default' when 'high' is missing
+            thumbnails = snippet['thumbnails']
+            thumbnail = (thumbnails.get('high') or thumbnails['default'])['url']
+
+            videos.append({
+                'video_id': video_id,
+                'title': title,
+                'channel_title': snippet['channelTitle'],
+                'published_at': snippet['publishedAt'],
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'duration': duration,
+                'view_count': int(view_count),
+                'thumbnail': thumbnail
+            })
+
+        return videos
+
+    def _get_recent_uploads_from_feed(self, channel_id: str,
+                                      published_after: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Reads a channel's uploads feed and returns snippet-shaped dicts (the fields
+        used from playlistItems.list) for videos published after the cutoff.
+        Returns None if the feed can't be fetched or parsed, so the caller can fall back.
+        """
+        import requests
+
+        try:
+            response = requests.get(FEED_URL.format(channel_id=channel_id), timeout=10)
+            response.raise_for_status()
+            root = ElementTree.fromstring(response.content)
+
+            channel_title = root.findtext('atom:title', '', _FEED_NS)
+            snippets = []
+            for entry in root.iterfind('atom:entry', _FEED_NS):
+                # Normalize to the Data API's format so string comparison and rendering match
+                published = datetime.fromisoformat(entry.findtext('atom:published', '', _FEED_NS))
+                published_at = published.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+                if published_at <= published_after:
+                    continue
+
+                thumbnail = entry.find('media:group/media:thumbnail', _FEED_NS)
+                snippets.append({
+                    'resourceId': {'videoId': entry.findtext('yt:videoId', '', _FEED_NS)},
+                    'title': entry.findtext('atom:title', '', _FEED_NS),
+                    'channelTitle': entry.findtext('atom:author/atom:name', channel_title, _FEED_NS),
+                    'publishedAt': published_at,
+                    'thumbnails': {'high': {'url': thumbnail.get('url') if thumbnail is not None else ''}},
+                })
+            return snippets
+        except Exception as e:
+            logger.warning(f"Could not read uploads feed for channel {channel_id}: {e}")
+            return None
+
+    def _get_uploads_playlists(self, channel_ids: List[str]) -> Dict[str, str]:
+        """
+        Maps each channel ID to its uploads playlist ID using batched channels.list calls.
+        Channels that don't exist (or whose batch failed) are absent from the result.
+        """
+        uploads_playlists = {}
+        step = self.MAX_IDS_PER_REQUEST
+        for start in range(0, len(channel_ids), step):
+            batch = channel_ids[start:start + step]
             try:
-                # Get channel uploads playlist ID
                 channel_response = self.youtube.channels().list(
-                    id=channel_id,
+                    id=",".join(batch),
                     part='contentDetails'
                 ).execute()
+            except Exception as e:
+                logger.error(f"Error fetching channel details for {len(batch)} channels: {e}")
+                continue
 
-                if not channel_response['items']:
+            for item in channel_response.get('items', []):
+                uploads_playlists[item['id']] = item['contentDetails']['relatedPlaylists']['uploads']
+
+            for channel_id in batch:
+                if channel_id not in uploads_playlists:
                     logger.warning(f"Channel not found: {channel_id}")
-                    continue
 
-                uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        return uploads_playlists
 
-                # Get recent videos from the uploads playlist
-                playlist_response = self.youtube.playlistItems().list(
-                    playlistId=uploads_playlist_id,
-                    part='snippet',
-                    maxResults=10
-                ).execute()
+    def _get_recent_uploads(self, channel_id: str, uploads_playlist_id: str,
+                            published_after: str) -> List[Dict[str, Any]]:
+        """
+        Returns playlist item snippets of a channel's uploads published after the cutoff.
+        Runs on worker threads, so it uses the thread's own service object.
+        """
+        try:
+            # Get recent videos from the uploads playlist
+            playlist_response = self._thread_service().playlistItems().list(
+                playlistId=uploads_playlist_id,
+                part='snippet',
+                maxResults=10
+            ).execute()
+        except Exception as e:
+            logger.error(f"Error fetching videos for channel {channel_id}: {e}")
+            return []
 
-                for item in playlist_response.get('items', []):
-                    snippet = item['snippet']
-                    published_at = snippet['publishedAt']
-                    
-                    if published_at > published_after:
-                        video_id = snippet['resourceId']['videoId']
-                        
-                        # Fetch additional details (duration, view count)
-                        video_details = self.youtube.videos().list(
-                            id=video_id,
-                            part='contentDetails,statistics'
-                        ).execute()
-                        
-                        if not video_details['items']:
-                            continue
-                            
-                        details = video_details['items'][0]
-                        duration, duration_seconds = self._parse_duration(details['contentDetails']['duration'])
-                        
-                        # 短い動画を除外
-                        if duration_seconds <= Config.MIN_VIDEO_DURATION_SECONDS:
-                            logger.info(f"Skipping short video (duration: {duration}): {snippet['title']}")
-                            continue
-                        
-                        view_count = details['statistics'].get('viewCount', '0')
-                        thumbnail = snippet['thumbnails'].get('high', snippet['thumbnails']['default'])['url']
-
-                        videos.append({
-                            'video_id': video_id,
-                            'title': snippet['title'],
-                            'channel_title': snippet['channelTitle'],
-                            'published_at': published_at,
-                            'url': f"https://www.youtube.com/watch?v={video_id}",
-                            'duration': duration,
-                            'view_count': int(view_count),
-                            'thumbnail': thumbnail
-                        })
+        return [
+            item['snippet'] for item in playlist_response.get('items', [])
+            if item['snippet']['publishedAt'] > published_after
+        ]
+
+    def _get_video_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches contentDetails and statistics for the given videos using batched videos.list calls.
+        """
+        details_by_id = {}
+        step = self.MAX_IDS_PER_REQUEST
+        for start in range(0, len(video_ids), step):
+            batch = video_ids[start:start + step]
+            try:
+                video_details = self.youtube.videos().list(
+                    id=",".join(batch),
+                    part='contentDetails,statistics'
+                ).execute()
             except Exception as e:
-                logger.error(f"Error fetching videos for channel {channel_id}: {e}")
+                logger.error(f"Error fetching details for {len(batch)} videos: {e}")
+                continue
 
-        return videos
+            for item in video_details.get('items', []):
+                details_by_id[item['id']] = item
 
-    def get_transcript(self, video_id: str) -> Optional[str]:
+        return details_by_id
+
+    def get_transcript(self, video_id: str, limiter: Optional[RateLimiter] = None) -> Optional[str]:
         """
         Fetches the transcript for a given video ID using youtube-transcript-api.
         Implements caching and exponential backoff retry logic to avoid IP restrictions.
@@ -185,6 +325,8 @@ class YouTubeClient:
         
         Args:
             video_id: YouTube video ID
+            limiter: Shared limiter spacing out requests across threads; every
+                attempt (including retries) waits for its own slot
             
         Returns:
             Transcript text or None if not available
@@ -198,6 +340,10 @@ class YouTubeClient:
         
         # Try to fetch transcript with exponential backoff
         for attempt in range(self.max_retries):
+            if limiter:
+                waited = limiter.acquire()
+                if waited:
+                    logger.info(f"Waited {waited:.1f} seconds before fetching {video_id} to avoid IP blocking")
             try:
                 # Try to get transcript list using correct API method
                 logger.info(f"Fetching transcript for video {video_id} (attempt {attempt + 1}/{self.max_retries})")
@@ -255,11 +401,15 @@ class YouTubeClient:
                 
                 # Combine all text entries into a single string
                 try:
-                    full_text = " ".join([entry['text'] for entry in fetched_transcript])
+                    texts = [entry['text'] for entry in fetched_transcript]
                 except TypeError:
                     # Fallback for object access if dict access fails
                     logger.debug("Using attribute access for transcript entries")
-                    full_text = " ".join([entry.text for entry in fetched_transcript])
+                    texts = [entry.text for entry in fetched_transcript]
+                # Auto-generated captions often repeat a segment verbatim; keep the first
+                full_text = " ".join(
+                    text for i, text in enumerate(texts) if i == 0 or text.strip() != texts[i - 1].strip()
+                )
                 
                 # Cache the result
                 if self.cache:
@@ -330,9 +480,10 @@ class YouTubeClient:
                         return None
                 # Handle other errors with exponential backoff (starting at 5 seconds)
                 elif attempt < self.max_retries - 1:
-                    wait_time = 5 * (self.backoff_factor ** attempt)  # Start at 5 seconds
+                    # Jittered so concurrent workers sharing an IP don't retry in lockstep
+                    wait_time = jittered_backoff(5 * (self.backoff_factor ** attempt))  # Start at 5 seconds
                     logger.warning(
-                        f"Retrying video {video_id} in {wait_time} seconds "
+                        f"Retrying video {video_id} in {wait_time:.1f} seconds "
                         f"(attempt {attempt + 1}/{self.max_retries})..."
                     )
                     time.sleep(wait_time)
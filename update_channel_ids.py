@@ -1,9 +1,16 @@
 import csv
-import os
+import re
 import sys
 from googleapiclient.discovery import build
 from src.config import Config
 
+# Channel ID in /channel/<id> URLs, ignoring any trailing path, query or fragment
+_CHANNEL_URL_RE = re.compile(r'/channel/([^/?#]+)')
+
+def get_channel_id_from_url(url):
+    match = _CHANNEL_URL_RE.search(url)
+    return match.group(1) if match else None
+
 def get_channel_id_from_handle(youtube, handle):
     try:
         response = youtube.channels().list(
@@ -38,52 +45,55 @@ def update_channel_ids():
     csv_path = 'generative_ai_channels.csv'
     txt_path = 'channel_ids.txt'
 
-    existing_ids = set()
-    if os.path.exists(txt_path):
+    try:
         with open(txt_path, 'r', encoding='utf-8') as f:
-            existing_ids = set(line.strip() for line in f if line.strip())
+            existing_ids = {cid for cid in map(str.strip, f.read().splitlines()) if cid}
+    except FileNotFoundError:
+        existing_ids = set()
 
     print(f"Loaded {len(existing_ids)} existing channel IDs.")
 
     new_ids = []
     
     with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        url_index = next(reader).index('Channel URL')
         for row in reader:
-            url = row['Channel URL']
-            channel_id = None
+            if len(row) <= url_index:
+                continue
+            url = row[url_index]
+            channel_id = get_channel_id_from_url(url)
 
-            if '/channel/' in url:
-                channel_id = url.split('/channel/')[-1]
-            elif '/@' in url:
-                handle = '@' + url.split('/@')[-1]
-                print(f"Resolving handle: {handle}")
-                channel_id = get_channel_id_from_handle(youtube, handle)
-            elif '/user/' in url:
-                username = url.split('/user/')[-1]
-                print(f"Resolving username: {username}")
-                channel_id = get_channel_id_from_username(youtube, username)
-            elif '/c/' in url:
-                # Custom URL, harder to resolve directly without search or scraping
-                # Try search
-                query = url.split('/c/')[-1]
-                print(f"Searching for custom URL: {query}")
-                try:
-                    response = youtube.search().list(
-                        part='snippet',
-                        q=query,
-                        type='channel',
-                        maxResults=1
-                    ).execute()
-                    if response['items']:
-                        channel_id = response['items'][0]['snippet']['channelId']
-                except Exception as e:
-                    print(f"Error searching for {query}: {e}")
-            else:
-                # Try direct search with channel name if URL format is unknown or just a custom name
-                # But be careful not to add wrong channels.
-                # For now, skip unknown formats or try to parse if it looks like a custom URL
-                pass
+            if not channel_id:
+                if '/@' in url:
+                    handle = '@' + url.split('/@')[-1]
+                    print(f"Resolving handle: {handle}")
+                    channel_id = get_channel_id_from_handle(youtube, handle)
+                elif '/user/' in url:
+                    username = url.split('/user/')[-1]
+                    print(f"Resolving username: {username}")
+                    channel_id = get_channel_id_from_username(youtube, username)
+                elif '/c/' in url:
+                    # Custom URL, harder to resolve directly without search or scraping
+                    # Try search
+                    query = url.split('/c/')[-1]
+                    print(f"Searching for custom URL: {query}")
+                    try:
+                        response = youtube.search().list(
+                            part='snippet',
+                            q=query,
+                            type='channel',
+                            maxResults=1
+                        ).execute()
+                        if response['items']:
+                            channel_id = response['items'][0]['snippet']['channelId']
+                    except Exception as e:
+                        print(f"Error searching for {query}: {e}")
+                else:
+                    # Try direct search with channel name if URL format is unknown or just a custom name
+                    # But be careful not to add wrong channels.
+                    # For now, skip unknown formats or try to parse if it looks like a custom URL
+                    pass
 
             if channel_id:
                 if channel_id not in existing_ids:
@@ -98,8 +108,7 @@ def update_channel_ids():
 
     if new_ids:
         with open(txt_path, 'a', encoding='utf-8') as f:
-            for cid in new_ids:
-                f.write(f"{cid}\n")
+            f.writelines(cid + '\n' for cid in new_ids)
         print(f"Added {len(new_ids)} new channel IDs to {txt_path}.")
     else:
         print("No new channel IDs found.")